@@ -1,9 +1,11 @@
 import re
+from functools import lru_cache
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Tuple
 from bisect import bisect_right
+from array import array
 
-@dataclass
+@dataclass(slots=True)
 class ChapterBoundary:
    chapter_number: int
    page_number: int
@@ -17,6 +19,11 @@ class ChapterBoundary:
 @dataclass
 class ChapterRegistry:
    boundaries: List[ChapterBoundary]=field(default_factory=list)
+   # Columns parallel to boundaries, rebuilt after changes: sorted page numbers and 'chNN' ids
+   _pages: Optional[array]=field(default=None, init=False, repr=False, compare=False)
+   _chapter_ids: List[str]=field(default_factory=list, init=False, repr=False, compare=False)
+   _last_idx: int=field(default=-1, init=False, repr=False, compare=False)
+
    def register_chapter(
          self,
          chapter_num: int,
@@ -25,29 +32,48 @@ class ChapterRegistry:
    ) -> None:
       boundary = ChapterBoundary(chapter_num, page_num, title)
       self.boundaries.append(boundary)
+      self._pages = None
 
    def finalize(self, page_num: int) -> str:
       self.boundaries.sort(key=lambda x: x.page_number)
+      self._build_columns()
+
+   def _build_columns(self) -> None:
+      self._pages = array('i', (b.page_number for b in self.boundaries))
+      self._chapter_ids = [f'ch{b.chapter_number:02d}' for b in self.boundaries]
+      self._last_idx = -1
+
+   def _find_index(self, page_num: int) -> int:
+      """Index of the boundary page_num falls under, or -1 if before the first chapter."""
+      if self._pages is None or len(self._pages) != len(self.boundaries):
+         self._build_columns()
+      pages = self._pages
+
+      # Sequential lookups usually land in the same chapter as the previous one
+      idx = self._last_idx
+      if idx >= 0 and pages[idx] <= page_num and (idx + 1 == len(pages) or page_num < pages[idx + 1]):
+         return idx
+
+      idx = bisect_right(pages, page_num) - 1
+      self._last_idx = idx
+      return idx
 
    def get_chapter_id(self, page_num: int) -> str:
       if not self.boundaries:
          return 'ch00'
       
-      page_numbers = [b.page_number for b in self.boundaries]
-      idx = bisect_right(page_numbers, page_num) - 1
+      idx = self._find_index(page_num)
 
       if idx < 0:
          return 'ch00'
       
-      chapter_num = self.boundaries[idx].chapter_number
-      return f'ch{chapter_num:02d}'
+      return self._chapter_ids[idx]
    
    def get_chapter_info(self, page_num: int) -> Optional[ChapterBoundary]:
       if not self.boundaries:
          return None
       
-      page_numbers = [b.page_number for b in self.boundaries]
-      idx = bisect_right(page_numbers, page_num) - 1
+      idx = self._find_index(page_num)
 
       if idx < 0:
          return None
@@ -65,57 +91,102 @@ class ChapterRegistry:
       
       return '\n'.join(lines)
    
+_FLAGS = re.IGNORECASE | re.MULTILINE
+
 CHAPTER_PATTERNS = [
    # "Chapter 1", "Chapter 2:", "Chapter 1 -"
-   r'Chapter\s+(\d+)',
+   re.compile(r'Chapter\s+(\d+)', _FLAGS),
 
    # "CHAPTER 1", "CHAPTER ONE"
-   r'CHAPTER\s+(\d+)',
+   re.compile(r'CHAPTER\s+(\d+)', _FLAGS),
 
    # "1. Introduction" (at start of line/page)
-   r'^(\d+)\.\s+[A-Z][a-z]+',
+   re.compile(r'^(\d+)\.\s+[A-Z][a-z]+', _FLAGS),
 
    # "1. Introduction" (followed by capitalized word)
-   r'^(\d+)\s+[A-Z][A-Z\s]+$'
+   re.compile(r'^(\d+)\s+[A-Z][A-Z\s]+$', _FLAGS)
 ]
 
 TOC_PATTERNS = [
    # "Chapter 1: Introduction...........15"
    # "Chapter 2 Data Structures.........45"
-   r'Chapter\s+(\d+)[:\-\s]*([^.]*?)\.+\s*(\d+)',
+   re.compile(r'Chapter\s+(\d+)[:\-\s]*([^.]*?)\.+\s*(\d+)', _FLAGS),
    
    # "1. Introduction...........15"
    # "1 Introduction............15"
-   r'^(\d+)[.\s]+([A-Z][^.]*?)\.+\s*(\d+)',
+   re.compile(r'^(\d+)[.\s]+([A-Z][^.]*?)\.+\s*(\d+)', _FLAGS),
    
    # "CHAPTER 1: INTRODUCTION...15"
-   r'CHAPTER\s+(\d+)[:\-\s]*([^.]*?)\.+\s*(\d+)',
+   re.compile(r'CHAPTER\s+(\d+)[:\-\s]*([^.]*?)\.+\s*(\d+)', _FLAGS),
    
    # "1 Introduction 15" (no dots)
-   r'^(\d+)\s+([A-Z][^0-9]*?)\s+(\d+)$',
+   re.compile(r'^(\d+)\s+([A-Z][^0-9]*?)\s+(\d+)$', _FLAGS),
 ]
 
+def combine_patterns(patterns: List[re.Pattern], flags: int=_FLAGS) -> re.Pattern:
+   """Join patterns into one alternation, naming each branch p0, p1, ... in priority order."""
+   return re.compile(
+      '|'.join(f'(?P<p{i}>{p.pattern})' for i, p in enumerate(patterns)),
+      flags
+   )
+
+def search_by_priority(
+      combined: re.Pattern,
+      patterns: List[re.Pattern],
+      text: str
+) -> Optional[re.Match]:
+   """
+   Same result as returning the first of `patterns` that matches `text`, but text
+   matching none of them (the common case) costs a single scan.
+   """
+   match = combined.search(text)
+   if match is None:
+      return None
+
+   # Leftmost hit may be a lower-priority branch; earlier patterns still win
+   idx = int(match.lastgroup[1:])
+   for pattern in patterns[:idx]:
+      earlier = pattern.search(text)
+      if earlier:
+         return earlier
+
+   return patterns[idx].search(text, match.start())
+
+def priority_match_pattern(patterns: List[re.Pattern], flags: int=_FLAGS) -> re.Pattern:
+   """
+   Single-sweep classifier in the style of re.Scanner: branches p0, p1, ... are
+   tried in order from the start of the string, each preceded by a lazy prefix
+   so it may match anywhere. One .match() returns the first pattern that hits.
+   """
+   branches = '|'.join(rf'[\s\S]*?(?P<p{i}>{p.pattern})' for i, p in enumerate(patterns))
+   return re.compile(rf'\A(?:{branches})', flags)
+
+CHAPTER_RE = combine_patterns(CHAPTER_PATTERNS)
+TOC_LINE_RE = priority_match_pattern(TOC_PATTERNS)
+
+# Title following a "Chapter N" heading, up to end of line
+CHAPTER_TITLE_RE = re.compile(r'Chapter\s+\d+[\s\-:]*(.+?)(?:\n|$)', re.IGNORECASE)
+
+@lru_cache(maxsize=4096)
 def parse_toc_line(line: str) -> Optional[Tuple[int, str, int]]:
    line = line.strip()
 
-   for pattern in TOC_PATTERNS:
-      match = re.search(pattern, line, re.IGNORECASE | re.MULTILINE)
-      if match:
-         try:
-            chapter_num = int(match.group(1))
-            title = match.group(2).strip() if len(match.groups()) >= 2 else None
-            page_num = match.group(3)
-
-            # Clean title
-            if title:
-               title = re.sub(r'\s+', ' ', title) # Normalize whitespace
-               title = title.strip('. -:')
-
-            return (chapter_num, title, page_num)
-         except (ValueError, IndexError):
-            continue
-   
-   return None
+   match = TOC_LINE_RE.match(line)
+   if not match:
+      return None
+
+   # Every TOC pattern captures (chapter, title, page) right after its branch group
+   base = TOC_LINE_RE.groupindex[match.lastgroup]
+   chapter_num = int(match.group(base + 1))
+   title = match.group(base + 2).strip()
+   page_num = match.group(base + 3)
+
+   # Clean title
+   if title:
+      title = ' '.join(title.split()) # Normalize whitespace
+      title = title.strip('. -:')
+
+   return (chapter_num, title, page_num)
 
 def extract_toc_from_pdf():
    return
@@ -124,24 +195,24 @@ def extract_toc_from_pdf():
 (Chapter number, chapter title)
 """
 def detect_chapter(text: str, page_num: int) -> Optional[Tuple[int, str]]:
+   return _detect_chapter_cached(text)
+
+# Detection depends only on the text; running heads repeat across pages
+@lru_cache(maxsize=2048)
+def _detect_chapter_cached(text: str) -> Optional[Tuple[int, str]]:
    text = text.strip()
 
-   for pattern in CHAPTER_PATTERNS:
-      match = re.search(pattern, text, re.MULTILINE | re.IGNORECASE)
-      if match:
-         chapter_num = int(match.group(1))
+   match = search_by_priority(CHAPTER_RE, CHAPTER_PATTERNS, text)
+   if not match:
+      return None
 
-         # Extract title
-         title_match = re.search(
-            r'Chapter\s+\d+[\s\-:]*(.+?)(?:\n|$)',
-            text,
-            re.IGNORECASE
-         )
-         title = title_match.group(1).strip() if title_match else None
+   chapter_num = int(match.group(1))
 
-         return (chapter_num, title)
-   
-   return None
+   # Extract title
+   title_match = CHAPTER_TITLE_RE.search(text)
+   title = title_match.group(1).strip() if title_match else None
+
+   return (chapter_num, title)
 
 def create_chapter_detector() -> ChapterRegistry:
    return ChapterRegistry()
@@ -8,14 +8,15 @@ Detects:
 - Configurable patterns for different textbook formats
 """
 
-import json
 import re
+import orjson
 from pathlib import Path
 from typing import List, Optional, Tuple, Set
 from dataclasses import dataclass, field
+from chapter_detector import combine_patterns, search_by_priority
 
 
-@dataclass
+@dataclass(slots=True)
 class SpecialPageType:
    """Represents a special page type within a chapter."""
    page_type: str  # 'practice', 'solutions', 'summary', etc.
@@ -27,7 +28,7 @@ class SpecialPageType:
       return f"{self.page_type.title()} @ page {self.page_number}"
 
 
-@dataclass
+@dataclass(slots=True)
 class ChapterBoundary:
    """Enhanced chapter boundary with special pages."""
    chapter_number: int
@@ -92,6 +93,64 @@ SPECIAL_PAGE_PATTERNS = {
    ]
 }
 
+# Lowercase substrings that every match of a page type's patterns contains;
+# headers with none of them skip that type's regex search
+SPECIAL_PAGE_TRIGGERS = {
+   'practice': ('exercise', 'problem'),
+   'solutions': ('solution', 'answer'),
+   'summary': ('summary', 'review'),
+   'review': ('review',),
+}
+
+SPECIAL_PAGE_FLAGS = re.IGNORECASE | re.MULTILINE
+
+# Page-start chapter header, e.g. "Chapter 3" or "Chapter 3: Sorting"
+CHAPTER_HEADER_RE = re.compile(r'^Chapter\s+(\d+)(?:[.:]\s+.+)?$', re.IGNORECASE)
+
+# Section number at line start, e.g. "1.2" (rules out a title candidate)
+SECTION_NUMBER_RE = re.compile(r'^\d+\.\d+')
+
+
+def compile_special_patterns(patterns: dict, triggers: dict = None) -> tuple:
+   """
+   Compile a {page_type: [regex_patterns]} dict once, up front, into a flat
+   dispatch tuple checked in the dict's order.
+   
+   Args:
+      patterns: Dictionary of {page_type: [regex_patterns]}
+      triggers: Optional {page_type: (lowercase substrings)} prefilter
+   
+   Returns:
+      Tuple of (page_type, triggers or None, alternation of its patterns, [compiled patterns])
+   """
+   triggers = triggers or {}
+   compiled = []
+   for page_type, pattern_list in patterns.items():
+      pattern_list = [re.compile(p, SPECIAL_PAGE_FLAGS) for p in pattern_list]
+      compiled.append((
+         page_type,
+         triggers.get(page_type),
+         combine_patterns(pattern_list, SPECIAL_PAGE_FLAGS),
+         pattern_list
+      ))
+   return tuple(compiled)
+
+
+COMPILED_SPECIAL_PAGE_PATTERNS = compile_special_patterns(
+   SPECIAL_PAGE_PATTERNS,
+   SPECIAL_PAGE_TRIGGERS
+)
+
+
+def _head(text: str, num_lines: int) -> str:
+   """First num_lines lines of text as one slice, without splitting the whole page."""
+   pos = -1
+   for _ in range(num_lines):
+      pos = text.find('\n', pos + 1)
+      if pos < 0:
+         return text
+   return text[:pos]
+
 
 def detect_chapter_at_page_start(text: str) -> Optional[Tuple[int, str]]:
    """
@@ -103,11 +162,20 @@ def detect_chapter_at_page_start(text: str) -> Optional[Tuple[int, str]]:
    if not text:
       return None
    
-   lines = text.split('\n')[:15]
+   header = _head(text, 15)
+   
+   # Cheap reject: every header the regex accepts contains "chapter"
+   if 'chapter' not in header.lower():
+      return None
+   
+   lines = header.split('\n')
    
    for i, line in enumerate(lines):
       line = line.strip()
-      match = re.match(r'^Chapter\s+(\d+)(?:[.:]\s+.+)?$', line, re.IGNORECASE)
+      if line[:7].lower() != 'chapter':
+         continue
+      
+      match = CHAPTER_HEADER_RE.match(line)
       
       if match:
          chapter_num = int(match.group(1))
@@ -117,7 +185,7 @@ def detect_chapter_at_page_start(text: str) -> Optional[Tuple[int, str]]:
          if i + 1 < len(lines):
                potential_title = lines[i + 1].strip()
                # Title should be non-empty and not a section number
-               if potential_title and not re.match(r'^\d+\.\d+', potential_title):
+               if potential_title and not SECTION_NUMBER_RE.match(potential_title):
                   title = potential_title
          
          return (chapter_num, title)
@@ -127,14 +195,14 @@ def detect_chapter_at_page_start(text: str) -> Optional[Tuple[int, str]]:
 
 def detect_special_page_type(
    text: str,
-   patterns: dict = SPECIAL_PAGE_PATTERNS
+   patterns: tuple = COMPILED_SPECIAL_PAGE_PATTERNS
 ) -> Optional[Tuple[str, str]]:
    """
    Detect if page contains special section (practice, solutions, etc.).
    
    Args:
       text: Page text to search
-      patterns: Dictionary of {page_type: [regex_patterns]}
+      patterns: Compiled patterns from compile_special_patterns()
    
    Returns:
       (page_type, matched_text) or None
@@ -143,13 +211,16 @@ def detect_special_page_type(
       return None
    
    # Check first ~20 lines where headers usually appear
-   header = '\n'.join(text.split('\n')[:20])
+   header = _head(text, 20)
+   header_lower = header.lower()
    
-   for page_type, pattern_list in patterns.items():
-      for pattern in pattern_list:
-         match = re.search(pattern, header, re.IGNORECASE | re.MULTILINE)
-         if match:
-               return (page_type, match.group(0))
+   for page_type, triggers, combined, pattern_list in patterns:
+      if triggers and not any(t in header_lower for t in triggers):
+         continue
+      
+      match = search_by_priority(combined, pattern_list, header)
+      if match:
+         return (page_type, match.group(0))
    
    return None
 
@@ -181,24 +252,28 @@ def scan_pagerecords_for_chapters(
    """
    boundaries = []
    seen_chapters = set()
+   special_counts = {}  # page_type -> count, tallied as pages are found
    last_page = 0
    current_chapter = None
    
    if special_patterns is None:
-      special_patterns = SPECIAL_PAGE_PATTERNS
+      special_patterns = COMPILED_SPECIAL_PAGE_PATTERNS
+   else:
+      special_patterns = compile_special_patterns(special_patterns)
    
    if verbose:
       print(f"  Scanning for chapters and special pages...")
    
-   with open(pagerecords_file, 'r', encoding='utf-8') as f:
+   with open(pagerecords_file, 'rb') as f:
       for line_num, line in enumerate(f, 1):
-         if not line.strip():
+         if line in (b'\n', b'\r\n'):
                continue
          
          try:
-               page_data = json.loads(line)
-         except json.JSONDecodeError:
-               if verbose:
+               page_data = orjson.loads(line)
+         except orjson.JSONDecodeError:
+               # Whitespace-only lines are skipped silently, as blank lines are
+               if verbose and line.strip():
                   print(f"    Warning: Skipping malformed JSON at line {line_num}")
                continue
          
@@ -244,6 +319,7 @@ def scan_pagerecords_for_chapters(
                if special_result:
                   page_type, matched_text = special_result
                   current_chapter.add_special_page(page_type, page_num, matched_text)
+                  special_counts[page_type] = special_counts.get(page_type, 0) + 1
                   
                   if verbose:
                      print(f"      → {page_type.title()} page @ {page_num}")
@@ -253,22 +329,16 @@ def scan_pagerecords_for_chapters(
    
    # Validation
    if boundaries and verbose:
-      chapter_nums = [b.chapter_number for b in boundaries]
-      expected = list(range(min(chapter_nums), max(chapter_nums) + 1))
-      missing = set(expected) - set(chapter_nums)
+      expected = range(min(seen_chapters), max(seen_chapters) + 1)
+      missing = set(expected) - seen_chapters
       
       if missing:
          print(f"    ⚠ Missing chapters: {sorted(missing)}")
       
       # Summary of special pages
-      total_special = sum(len(b.special_pages) for b in boundaries)
+      total_special = sum(special_counts.values())
       if total_special > 0:
          print(f"\n  Found {total_special} special pages:")
-         special_counts = {}
-         for b in boundaries:
-               for sp in b.special_pages:
-                  special_counts[sp.page_type] = special_counts.get(sp.page_type, 0) + 1
-         
          for page_type, count in sorted(special_counts.items()):
                print(f"    - {page_type.title()}: {count}")
    
@@ -281,9 +351,8 @@ def save_chapters_jsonl(
    verbose: bool = True
 ):
    """Save enhanced chapter boundaries to JSONL file."""
-   with open(output_file, 'w', encoding='utf-8') as f:
-      for b in boundaries:
-         f.write(json.dumps(b.to_dict(), ensure_ascii=False) + '\n')
+   with open(output_file, 'wb') as f:
+      f.writelines([orjson.dumps(b.to_dict()) + b'\n' for b in boundaries])
    
    if verbose:
       print(f"\n  ✓ Saved {len(boundaries)} chapters to {output_file.name}")
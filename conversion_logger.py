@@ -3,13 +3,13 @@ Conversion logging system for tracking PDF processing status.
 Maintains a JSONL log of all PDFs and their conversion status.
 """
 
-import json
+import orjson
 from pathlib import Path
 from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversionLogEntry:
    """Single log entry for a PDF document."""
    document_title: str      # PDF stem (filename without extension)
@@ -20,9 +20,20 @@ class ConversionLogEntry:
    page_count: Optional[int] = None
    word_count: Optional[int] = None
    question_count: Optional[int] = None
+   book_id: Optional[str] = None      # DocumentRecord/PageRecords book ID from the latest conversion
    
    def to_dict(self) -> Dict:
-      return asdict(self)
+      return {
+         'document_title': self.document_title,
+         'document_id': self.document_id,
+         'document_file': self.document_file,
+         'converted': self.converted,
+         'output_path': self.output_path,
+         'page_count': self.page_count,
+         'word_count': self.word_count,
+         'question_count': self.question_count,
+         'book_id': self.book_id,
+      }
    
    @classmethod
    def from_dict(cls, data: Dict) -> 'ConversionLogEntry':
@@ -30,7 +41,14 @@ class ConversionLogEntry:
 
 
 class ConversionLogger:
-   """Manages the conversion log file."""
+   """
+   Manages the conversion log file.
+   
+   The log is append-only: adds, updates and deletes each append one record,
+   and on load the last record for a document_title wins (a record with
+   "deleted": true removes it). Entries are indexed in memory by title, and
+   the file is compacted once stale records outnumber live ones 2:1.
+   """
    
    def __init__(self, log_path: Path):
       self.log_path = Path(log_path)
@@ -39,30 +57,74 @@ class ConversionLogger:
       # Create log file if it doesn't exist
       if not self.log_path.exists():
          self.log_path.touch()
-   
-   def _read_all_entries(self) -> List[ConversionLogEntry]:
-      """Read all log entries from file."""
-      entries = []
       
-      if not self.log_path.exists():
-         return entries
+      self._entries: Dict[str, ConversionLogEntry] = {}
+      self._num_records = 0   # Records in the file, including superseded ones
+      self._signature = None  # (mtime_ns, size) of the file when last read/written
+      self._load()
+   
+   def _file_signature(self) -> Optional[tuple]:
+      try:
+         stat = self.log_path.stat()
+      except FileNotFoundError:
+         return None
+      return (stat.st_mtime_ns, stat.st_size)
+   
+   def _load(self) -> None:
+      """Replay the log file into the in-memory index."""
+      entries = {}
+      num_records = 0
       
-      with open(self.log_path, 'r', encoding='utf-8') as f:
-         for line in f:
-               if line.strip():  # Skip empty lines
+      if self.log_path.exists():
+         with open(self.log_path, 'rb') as f:
+            for line in f:
+                  if line in (b'\n', b'\r\n'):  # Skip empty lines
+                     continue
+                  
                   try:
-                     data = json.loads(line)
-                     entries.append(ConversionLogEntry.from_dict(data))
-                  except json.JSONDecodeError:
+                     data = orjson.loads(line)
+                  except orjson.JSONDecodeError:
                      continue
+                  
+                  num_records += 1
+                  title = data.get('document_title')
+                  if data.get('deleted'):
+                     entries.pop(title, None)
+                  else:
+                     entries[title] = ConversionLogEntry.from_dict(data)
       
-      return entries
+      self._entries = entries
+      self._num_records = num_records
+      self._signature = self._file_signature()
+   
+   def _sync(self) -> None:
+      """Reload if the file was changed by someone else (e.g. another logger instance)."""
+      if self._file_signature() != self._signature:
+         self._load()
+   
+   def _read_all_entries(self) -> List[ConversionLogEntry]:
+      """Get all current log entries."""
+      self._sync()
+      return list(self._entries.values())
    
    def _write_all_entries(self, entries: List[ConversionLogEntry]):
       """Write all entries back to file (overwrites)."""
-      with open(self.log_path, 'w', encoding='utf-8') as f:
-         for entry in entries:
-               f.write(json.dumps(entry.to_dict()) + '\n')
+      with open(self.log_path, 'wb') as f:
+         f.writelines([orjson.dumps(entry.to_dict()) + b'\n' for entry in entries])
+      
+      self._num_records = len(entries)
+      self._signature = self._file_signature()
+   
+   def _append_record(self, record: Dict) -> None:
+      """Append one record to the log, compacting it if mostly stale."""
+      with open(self.log_path, 'ab') as f:
+         f.write(orjson.dumps(record) + b'\n')
+      
+      self._num_records += 1
+      self._signature = self._file_signature()
+      
+      if self._num_records > 2 * len(self._entries):
+         self._write_all_entries(list(self._entries.values()))
    
    def get_entry(self, pdf_name: str) -> Optional[ConversionLogEntry]:
       """
@@ -74,13 +136,8 @@ class ConversionLogger:
       Returns:
          ConversionLogEntry if found, None otherwise
       """
-      entries = self._read_all_entries()
-      
-      for entry in entries:
-         if entry.document_title == pdf_name:
-               return entry
-      
-      return None
+      self._sync()
+      return self._entries.get(pdf_name)
    
    def add_entry(self, entry: ConversionLogEntry) -> None:
       """
@@ -89,15 +146,15 @@ class ConversionLogger:
       Args:
          entry: ConversionLogEntry to add
       """
-      existing = self.get_entry(entry.document_title)
+      self._sync()
       
-      if existing:
+      if entry.document_title in self._entries:
          # Entry already exists, don't add duplicate
          return
       
       # Append new entry
-      with open(self.log_path, 'a', encoding='utf-8') as f:
-         f.write(json.dumps(entry.to_dict()) + '\n')
+      self._entries[entry.document_title] = entry
+      self._append_record(entry.to_dict())
    
    def update_entry(self, pdf_name: str, **updates) -> bool:
       """
@@ -110,25 +167,24 @@ class ConversionLogger:
       Returns:
          True if entry was found and updated, False otherwise
       """
-      entries = self._read_all_entries()
-      found = False
+      entry = self.get_entry(pdf_name)
+      
+      if entry is None:
+         return False
       
-      for i, entry in enumerate(entries):
-         if entry.document_title == pdf_name:
-               # Update fields
-               for key, value in updates.items():
-                  if hasattr(entry, key):
-                     setattr(entry, key, value)
-               found = True
-               break
+      # Update fields
+      for key, value in updates.items():
+         if hasattr(entry, key):
+               setattr(entry, key, value)
       
-      if found:
-         self._write_all_entries(entries)
+      # Latest record wins on replay
+      self._append_record(entry.to_dict())
       
-      return found
+      return True
    
    def mark_as_converted(self, pdf_name: str, output_path: str, 
-                        page_count: int = 0, word_count: int = 0) -> bool:
+                        page_count: int = 0, word_count: int = 0,
+                        book_id: Optional[str] = None) -> bool:
       """
       Mark a PDF as converted.
       
@@ -137,6 +193,7 @@ class ConversionLogger:
          output_path: Path to conversion output directory
          page_count: Number of pages converted
          word_count: Total word count
+         book_id: Book ID written to the DocumentRecord and PageRecords
          
       Returns:
          True if successfully updated
@@ -146,7 +203,8 @@ class ConversionLogger:
          converted=True,
          output_path=output_path,
          page_count=page_count,
-         word_count=word_count
+         word_count=word_count,
+         book_id=book_id
       )
    
    def is_converted(self, pdf_name: str) -> bool:
@@ -186,16 +244,13 @@ class ConversionLogger:
       Returns:
          True if entry was found and deleted
       """
-      entries = self._read_all_entries()
-      original_len = len(entries)
-      
-      entries = [e for e in entries if e.document_title != pdf_name]
-      
-      if len(entries) < original_len:
-         self._write_all_entries(entries)
-         return True
+      if self.get_entry(pdf_name) is None:
+         return False
       
-      return False
+      # Tombstone record; replay drops the entry
+      del self._entries[pdf_name]
+      self._append_record({'document_title': pdf_name, 'deleted': True})
+      return True
 
 
 # ============================================================================
@@ -223,7 +278,8 @@ def log_new_pdf(logger: ConversionLogger, pdf_path: Path, document_id: str):
 
 
 def log_completed_conversion(logger: ConversionLogger, pdf_name: str, 
-                           output_path: str, page_count: int, word_count: int):
+                           output_path: str, page_count: int, word_count: int,
+                           book_id: Optional[str] = None):
    """
    Mark a PDF conversion as complete.
    
@@ -233,12 +289,14 @@ def log_completed_conversion(logger: ConversionLogger, pdf_name: str,
       output_path: Path to output directory
       page_count: Number of pages
       word_count: Total words
+      book_id: Book ID of the converted DocumentRecord
    """
    success = logger.mark_as_converted(
       pdf_name,
       output_path,
       page_count,
-      word_count
+      word_count,
+      book_id
    )
    
    if success:
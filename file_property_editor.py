@@ -7,17 +7,20 @@ Allows editing fields in Questions.jsonl and Answers.jsonl:
 - Auto-fill: Run functions like find_chapters(), fill_author()
 """
 
-import json
+import mmap
+import sys
+import orjson
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
 from dataclasses import dataclass
+from operator import itemgetter
 
 # ============================================================================
 # AUTO-FILL FUNCTIONS
 # ============================================================================
 
-def autofill_chapters(records: List[Dict], pages_file: Path) -> List[Dict]:
-   """Use chapter_detector to fill chapter field from PageRecords."""
+def autofill_chapters(records: List[Dict], pages_file: Path) -> Optional[List[Dict]]:
+   """Use chapter_detector to fill chapter field from PageRecords. Returns None if nothing was updated."""
    
    from chapter_scanner import scan_pagerecords_for_chapters
    from bisect import bisect_right
@@ -29,33 +32,31 @@ def autofill_chapters(records: List[Dict], pages_file: Path) -> List[Dict]:
    # Build lookup for page -> chapter using bisect
    boundary_pages = [b.page_number for b in boundaries]
 
-   def get_chapter_for_page(page_num):
-      if not boundaries:
-         return None
-      idx = bisect_right(boundary_pages, page_num) - 1
-      if idx < 0:
-         return None
-      return boundaries[idx]
-
    # Update records
    updated = 0
-   for record in records:
-      page_num = record.get('pdf_page')
-      if page_num:
-         chapter_info = get_chapter_for_page(page_num)
-         if chapter_info:
-               record['chapter'] = str(chapter_info.chapter_number)
-               if chapter_info.chapter_title:
-                  record['chapter_title'] = chapter_info.chapter_title
-               updated += 1
+   if boundaries:
+      for record in records:
+         page_num = record.get('pdf_page')
+         if not page_num:
+            continue
+
+         idx = bisect_right(boundary_pages, page_num) - 1
+         if idx < 0:
+            continue
+
+         chapter_info = boundaries[idx]
+         record['chapter'] = str(chapter_info.chapter_number)
+         if chapter_info.chapter_title:
+            record['chapter_title'] = chapter_info.chapter_title
+         updated += 1
    
    print(f"✓ Updated {updated} records with chapter info")
    
-   return records
+   return records if updated else None
 
 
-def autofill_manual(records: List[Dict], field: str) -> List[Dict]:
-   """Manually enter a value to fill in all records."""
+def autofill_manual(records: List[Dict], field: str) -> Optional[List[Dict]]:
+   """Manually enter a value to fill in all records. Returns None if cancelled."""
    
    current_value = records[0].get(field, 'null') if records else 'null'
    print(f"\n✎ Current value: {current_value}")
@@ -64,7 +65,7 @@ def autofill_manual(records: List[Dict], field: str) -> List[Dict]:
    
    if not new_value:
       print("✗ No value entered, cancelled")
-      return records
+      return None
    
    # Confirm
    print(f"\n⚠  This will update ALL {len(records)} records")
@@ -72,7 +73,7 @@ def autofill_manual(records: List[Dict], field: str) -> List[Dict]:
    
    if confirm != 'y':
       print("Cancelled")
-      return records
+      return None
    
    # Update
    for record in records:
@@ -83,15 +84,15 @@ def autofill_manual(records: List[Dict], field: str) -> List[Dict]:
    return records
 
 
-def autofill_clear(records: List[Dict], field: str) -> List[Dict]:
-   """Clear (set to null) a field in all records."""
+def autofill_clear(records: List[Dict], field: str) -> Optional[List[Dict]]:
+   """Clear (set to null) a field in all records. Returns None if cancelled."""
    
    print(f"\n⚠  This will clear '{field}' in ALL {len(records)} records")
    confirm = input(f"Are you sure? (y/n) >> ").strip().lower()
    
    if confirm != 'y':
       print("Cancelled")
-      return records
+      return None
    
    # Update
    for record in records:
@@ -114,42 +115,115 @@ class FieldInfo:
    count_filled: int
    sample_values: List[Any]
 
+def update_field_info(info: FieldInfo, value: Any) -> None:
+   """Fold one record's value into a running FieldInfo (keeps up to 5 distinct samples)."""
+   if value is None or value == 'null':
+      info.count_null += 1
+      return
+   
+   info.count_filled += 1
+   if info.count_filled == 1:
+      info.current_value = value
+   if len(info.sample_values) < 5 and value not in info.sample_values:
+      info.sample_values.append(value)
+
+
 def analyze_field(records: List[Dict], field: str) -> FieldInfo:
    """Analyze a field across all records."""
    
-   values = []
-   null_count = 0
+   info = FieldInfo(name=field, current_value=None, count_null=0, count_filled=0, sample_values=[])
    
    for record in records:
-      value = record.get(field)
-      if value is None or value == 'null':
-         null_count += 1
-      else:
-         values.append(value)
+      update_field_info(info, record.get(field))
    
-   # Get unique sample values (up to 5)
-   unique_values = list(set(values))[:5]
+   return info
+
+
+def analyze_all_fields(records: Iterable[Dict]) -> Tuple[int, Dict[str, FieldInfo]]:
+   """
+   Analyze every field in a single pass over the records.
+   
+   Fields are taken from the first record; records missing a field count it as null.
+   
+   Returns:
+      (number of records, {field: FieldInfo} in first-record field order)
+   """
+   num_records = 0
+   field_infos = {}
+   fields = ()
+   infos = ()
+   get_values = None
    
-   return FieldInfo(
-      name=field,
-      current_value=values[0] if values else None,
-      count_null=null_count,
-      count_filled=len(values),
-      sample_values=unique_values
-   )
+   for record in records:
+      if not num_records:
+         field_infos = {
+               field: FieldInfo(name=field, current_value=None, count_null=0, count_filled=0, sample_values=[])
+               for field in record
+         }
+         fields = tuple(field_infos)
+         infos = tuple(field_infos.values())
+         # Pull every field in one C call (itemgetter returns a bare value for a single key)
+         if len(fields) > 1:
+            get_values = itemgetter(*fields)
+         elif fields:
+            get_values = lambda r, f=fields[0]: (r[f],)
+      
+      num_records += 1
+      if get_values is None:
+         continue
+      try:
+         values = get_values(record)
+      except KeyError:
+         values = tuple(record.get(field) for field in fields)
+      for info, value in zip(infos, values):
+         update_field_info(info, value)
+   
+   return num_records, field_infos
+
+
+# Short string values (book_id, chapter, section labels, ...) repeat on nearly every record;
+# interning them lets all records share one object per distinct value
+INTERN_MAX_LEN = 64
+
+def intern_values(record: Dict) -> Dict:
+   """Intern the record's short top-level string values in place."""
+   for key, value in record.items():
+      if type(value) is str and len(value) <= INTERN_MAX_LEN:
+         record[key] = sys.intern(value)
+   return record
+
+
+def iter_jsonl(file_path: Path) -> Iterator[Dict]:
+   """Yield one record per non-blank line, parsing slices of a read-only mmap of the file."""
+   
+   with open(file_path, 'rb') as f:
+      # mmap refuses zero-length files
+      if f.seek(0, 2) == 0:
+         return
+      with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+         start, size = 0, len(mm)
+         while start < size:
+               end = mm.find(b'\n', start)
+               if end < 0:
+                  end = size   # Last line without a trailing newline
+               line = mm[start:end]
+               if line.strip():
+                  yield intern_values(orjson.loads(line))
+               start = end + 1
+
+
+def load_all(file_path: Path) -> List[Dict]:
+   """Load every record of a JSONL file (only needed when editing)."""
+   return list(iter_jsonl(file_path))
 
 
 def show_file_properties(file_path: Path, output_dir: Path):
    """Show and edit properties of a JSONL file."""
    
-   # Load records
-   records = []
-   with open(file_path, 'r', encoding='utf-8') as f:
-      for line in f:
-         if line.strip():
-               records.append(json.loads(line))
+   # Stream records, keeping only per-field aggregates
+   num_records, field_infos = analyze_all_fields(iter_jsonl(file_path))
    
-   if not records:
+   if not num_records:
       print(f"\n⚠  File is empty!")
       input("Press Enter to continue...")
       return
@@ -158,20 +232,18 @@ def show_file_properties(file_path: Path, output_dir: Path):
    print(f"FILE PROPERTIES: {file_path.name}")
    print(f"{'='*70}\n")
    
-   print(f"Total records: {len(records)}\n")
+   print(f"Total records: {num_records}\n")
    
    # Get all fields from first record
-   all_fields = list(records[0].keys())
+   all_fields = list(field_infos.keys())
    
    # Analyze each field
    print("Field Analysis:\n")
    print(f"{'Field':<25} {'Filled':<10} {'Null':<10} Sample Values")
    print(f"{'-'*70}")
    
-   field_infos = {}
    for field in all_fields:
-      info = analyze_field(records, field)
-      field_infos[field] = info
+      info = field_infos[field]
       
       # Format sample values
       if info.sample_values:
@@ -211,15 +283,26 @@ def show_file_properties(file_path: Path, output_dir: Path):
          continue
       
       # Show edit options for this field
-      if edit_field(records, selected_field, file_path, output_dir):
+      if edit_field(load_all(file_path), selected_field, file_path, output_dir, field_infos[selected_field]):
          # Field was modified, save and return
          return
 
 
-def edit_field(records: List[Dict], field: str, file_path: Path, output_dir: Path) -> bool:
-   """Edit a specific field. Returns True if file was modified."""
+def edit_field(
+   records: List[Dict],
+   field: str,
+   file_path: Path,
+   output_dir: Path,
+   info: Optional[FieldInfo] = None
+) -> bool:
+   """
+   Edit a specific field. Returns True if file was modified.
    
-   info = analyze_field(records, field)
+   Pass the FieldInfo already computed for the file to skip re-scanning the records.
+   """
+   
+   if info is None:
+      info = analyze_field(records, field)
    
    print(f"\n{'='*70}")
    print(f"EDIT FIELD: {field}")
@@ -284,12 +367,16 @@ def edit_field(records: List[Dict], field: str, file_path: Path, output_dir: Pat
       else:
          records = func(records, field)
       
+      # Nothing changed: leave the file as it is instead of rewriting every record
+      if records is None:
+         input("\nPress Enter to continue...")
+         return False
+      
       # Save modified records
       print(f"\n✎ Saving changes to {file_path.name}...")
       
-      with open(file_path, 'w', encoding='utf-8') as f:
-         for record in records:
-               f.write(json.dumps(record, ensure_ascii=False) + '\n')
+      with open(file_path, 'wb') as f:
+         f.writelines(orjson.dumps(record) + b'\n' for record in records)
       
       print(f"✓ File saved!")
       input("\nPress Enter to continue...")
@@ -304,7 +391,7 @@ def edit_field(records: List[Dict], field: str, file_path: Path, output_dir: Pat
       return False
 
 
-def autofill_chapters_wrapper(records: List[Dict], pages_file: Path) -> List[Dict]:
+def autofill_chapters_wrapper(records: List[Dict], pages_file: Path) -> Optional[List[Dict]]:
    """Wrapper for autofill_chapters that passes pages_file."""
    return autofill_chapters(records, pages_file)
 
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-import re
+import os
 import uuid
+import hashlib
 import unicodedata
+from functools import lru_cache
 from dataclasses import dataclass
+from typing import Iterator
 
 BOOK_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_DNS, "eecs281.textbook")
 
@@ -15,12 +18,30 @@ Args:
 Returns:
     A normalized string suitable for use in IDs
 """
+@lru_cache(maxsize=4096)
 def _norm(s: str) -> str:
-    s = unicodedata.normalize('NFKC', s or '')
-    s = s.strip().lower()
-    s = re.sub(r'\s+', ' ', s)  # Replace multiple whitespace with single space
+    s = s or ''
+    if not s.isascii():  # NFKC leaves pure-ASCII strings unchanged
+        s = unicodedata.normalize('NFKC', s)
+    s = ' '.join(s.lower().split())  # Trim and replace multiple whitespace with single space
     return s
 
+""" -------------------------------------------------------------------------------------------------------- """
+"""
+Format 16 raw bytes as a UUID string, stamping the version and RFC 4122 variant bits
+(same text as str(uuid.UUID(bytes=..., version=...)) without building a UUID object)
+Args:
+    b: The 16 bytes to format (modified in place)
+    version: The UUID version to stamp (4 or 5)
+Returns:
+    The canonical 8-4-4-4-12 hex string
+"""
+def _format_uuid(b: bytearray, version: int) -> str:
+    b[6] = (b[6] & 0x0F) | (version << 4)
+    b[8] = (b[8] & 0x3F) | 0x80
+    x = b.hex()
+    return f'{x[:8]}-{x[8:12]}-{x[12:16]}-{x[16:20]}-{x[20:]}'
+
 """ -------------------------------------------------------------------------------------------------------- """
 """
 Deterministic, namespaced IDs
@@ -29,25 +50,56 @@ class IDFactory:
     PROJECT_SALT: str = "pdf_processor_v1"
     PROJECT_NAMESPACE: str = str(uuid.UUID('12345678-1234-5678-1234-567812345678'))  # Fixed namespace for all IDs in this project
     @staticmethod
+    @lru_cache(maxsize=None)
     def _ns() -> uuid.UUID:
         return uuid.uuid5(uuid.UUID(IDFactory.PROJECT_NAMESPACE), IDFactory.PROJECT_SALT)
     
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _ns_sha1():
+        return hashlib.sha1(IDFactory._ns().bytes)
+    
+    @staticmethod
+    def _uuid5(name: str) -> str:
+        # Same result as str(uuid.uuid5(IDFactory._ns(), name)), but resumes from the hashed
+        # namespace and formats the hex directly instead of building a UUID object
+        h = IDFactory._ns_sha1().copy()
+        h.update(name.encode('utf-8'))
+        return _format_uuid(bytearray(h.digest()[:16]), 5)
+    
+    @staticmethod
+    def random_ids(count: int) -> Iterator[str]:
+        # Random IDs like str(uuid.uuid4()), drawing the randomness for all of them with one
+        # os.urandom call instead of one per ID
+        buf = os.urandom(16 * count)
+        for i in range(0, len(buf), 16):
+            yield _format_uuid(bytearray(buf[i:i + 16]), 4)
+    
     @staticmethod
     def book_id(book_key: str) -> str:
         name = f'book:{_norm(book_key)}'
-        return str(uuid.uuid5(IDFactory._ns(), name))
+        return IDFactory._uuid5(name)
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def section_id(book_id: str, section_key: str) -> str:
         name = f'section|book:{_norm(book_id)}|{_norm(section_key)}|key:{_norm(section_key)}'
-        return str(uuid.uuid5(IDFactory._ns(), name))
+        return IDFactory._uuid5(name)
     
     @staticmethod
     def page_id(book_id: str, page_number: int) -> str:
         name = f'page|book:{_norm(book_id)}|number:{int(page_number)}'
-        return str(uuid.uuid5(IDFactory._ns(), name))
+        return IDFactory._uuid5(name)
     
     @staticmethod
     def qa_id(book_id: str, problem_key: str) -> str:
         name = f'qa|book:{_norm(book_id)}|problem:{_norm(problem_key)}'
-        return str(uuid.uuid5(IDFactory._ns(), name))
\ No newline at end of file
+        return IDFactory._uuid5(name)
+    
+    @staticmethod
+    def to_bytes(id_str: str) -> bytes:
+        return uuid.UUID(id_str).bytes
+    
+    @staticmethod
+    def from_bytes(id_bytes: bytes) -> str:
+        return str(uuid.UUID(bytes=id_bytes))
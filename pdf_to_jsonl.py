@@ -1,12 +1,18 @@
+import os
+import re
 import uuid
 import fitz
-import json
+import orjson
 import time
+from operator import itemgetter
 from pathlib import Path
-from dataclasses import asdict, dataclass, field, is_dataclass
-from typing import List, Optional, TYPE_CHECKING, Union, Tuple, Set, Dict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from functools import singledispatch
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import List, Optional, TYPE_CHECKING, Union, Tuple, Set, Dict, Iterator
 from id_factory import IDFactory
-from regex_parts import has_answer, has_question, has_chapter, has_section
+from regex_parts import page_flags
 from conversion_logger import ConversionLogger, log_new_pdf, log_completed_conversion
 from chapter_scanner import scan_pagerecords_for_chapters, save_chapters_jsonl
 from section_scanner import scan_pagerecords_for_sections, save_sections_jsonl
@@ -18,11 +24,11 @@ if TYPE_CHECKING:
 QAItem = Union['QuestionRecord', 'AnswerRecord']
 
 """ -------------------------------------------------------------------------------------------------------- """
-@dataclass
+@dataclass(slots=True)
 class DocumentRecord:
    id: Optional[str]=None                           # Individual book ID (UUID) generated from title/author/year
-   section_ids: Set[str]=field(default_factory=set) # Set of section_ids in the book
-   page_ids: Set[str]=field(default_factory=set)    # Set of page_ids in the book
+   section_ids: Set[bytes]=field(default_factory=set) # Set of section_ids in the book (16-byte UUIDs)
+   page_ids: Set[bytes]=field(default_factory=set)    # Set of page_ids in the book (16-byte UUIDs)
    book_domain: Optional[str]=None                  # Domain or subject area of the book (e.g. "computer science", "physics", etc.)
    title: Optional[str]=None                        # Book title
    author: Optional[str]=None                       # Book author(s)
@@ -42,7 +48,7 @@ class DocumentRecord:
    
 
 """ -------------------------------------------------------------------------------------------------------- """
-@dataclass
+@dataclass(slots=True)
 class SectionRecord:
    id: Optional[str]=None                           # Unique section ID (UUID) generated from book_id + section label/title
    page_ids: Set[str]=field(default_factory=set)    # Set of page IDs this section appears in
@@ -57,7 +63,7 @@ class SectionRecord:
    text_embedding: Optional[List[float]]=None       # Optional text embedding for the section (e.g. from a language model)
 
 """ -------------------------------------------------------------------------------------------------------- """
-@dataclass
+@dataclass(slots=True)
 class PageRecord:
    id: Optional[str]=None                           # Unique page ID (UUID) generated from book_id + page number for traceability
    section_ids: Set[str]=field(default_factory=set) # Set of section_ids that this page contains (for multi-section pages)
@@ -72,25 +78,77 @@ class PageRecord:
    has_answer: bool=False                           # Whether an answer appears on a page
    text_embedding: Optional[List[float]]=None       # Optional text embedding for the page (e.g. from a language model)
 
+   def to_dict(self) -> dict:
+      """Convert to dictionary for JSON serialization (one pass, no asdict deep copy)."""
+      return {
+         "id": self.id,
+         "section_ids": sorted(self.section_ids),
+         "book_id": self.book_id,
+         "pdf_page_number": self.pdf_page_number,
+         "real_page_number": self.real_page_number,
+         "text": self.text,
+         "word_count": self.word_count,
+         "has_chapter": self.has_chapter,
+         "has_section": self.has_section,
+         "has_question": self.has_question,
+         "has_answer": self.has_answer,
+         "text_embedding": self.text_embedding,
+      }
+
 """ -------------------------------------------------------------------------------------------------------- """
 """
 Convert dataclass objects to JSON-serializable format, handling sets and nested dataclasses.
+Dispatches on the argument's type; dataclasses have no common base class, so they are handled by
+the fallback and walked field by field instead of being deep-copied with asdict first.
 Args:
    obj - The object to convert (can be a dataclass, dict, list, set, or primitive type)
 Returns:
-   A JSON-serializable version of the object (e.g. sets converted to sorted lists, dataclasses converted to dicts)
+   A JSON-serializable version of the object (e.g. sets converted to sorted lists, dataclasses converted to dicts,
+   sets of 16-byte UUIDs converted back to UUID strings)
 """
+@singledispatch
 def to_jsonable(obj):
-   if is_dataclass(obj):
-      obj = asdict(obj)
-   if isinstance(obj, dict):
-      return {k: to_jsonable(v) for k, v in obj.items()}
-   if isinstance(obj, list):
-      return [to_jsonable(v) for v in obj]
-   if isinstance(obj, set):
-      return sorted(obj)
+   # Records with a hand-written to_dict already return JSON-ready values
+   if hasattr(obj, "to_dict"):
+      return obj.to_dict()
+   if is_dataclass(obj) and not isinstance(obj, type):
+      return {f.name: to_jsonable(getattr(obj, f.name)) for f in fields(obj)}
+   return obj
+
+@to_jsonable.register(str)
+@to_jsonable.register(int)
+@to_jsonable.register(float)
+@to_jsonable.register(type(None))
+def _(obj):
    return obj
 
+@to_jsonable.register(dict)
+def _(obj):
+   return {k: to_jsonable(v) for k, v in obj.items()}
+
+@to_jsonable.register(list)
+def _(obj):
+   return [to_jsonable(v) for v in obj]
+
+@to_jsonable.register(set)
+def _(obj):
+   # Byte order of packed UUIDs matches the order of their string form
+   if obj and isinstance(next(iter(obj)), bytes):
+      return [IDFactory.from_bytes(b) for b in sorted(obj)]
+   return sorted(obj)
+
+""" -------------------------------------------------------------------------------------------------------- """
+"""
+Serialize a PageRecord straight to a PageRecords JSONL line. The schema is fixed, so this skips the
+generic to_jsonable walk and uses PageRecord.to_dict.
+Args:
+   page - PageRecord object
+Returns:
+   JSON bytes for the page, newline-terminated
+"""
+def page_to_json_bytes(page: PageRecord) -> bytes:
+   return orjson.dumps(page.to_dict()) + b'\n'
+
 """ -------------------------------------------------------------------------------------------------------- """
 """
 PDF to JSONL conversion using PyMuPDF page with improved gap detection.
@@ -114,45 +172,37 @@ def words_to_text(
       )
    
    # Sort top to bottom, then left to right
-   words.sort(key=lambda w: (w[5], w[6], w[1], w[0]))
+   words.sort(key=itemgetter(5, 6, 1, 0))
    
    lines = []
    current_line = []
-   prev = None
+   prev_block = prev_line = None
+   prev_x1 = 0.0
    
-   for w in words:
-      x0, y0, x1, y1, text, block_no, line_no, word_no = w
-      
-      if prev is None:
-         current_line = [text]
-         prev = w
-         continue
-      
+   for x0, _, x1, _, text, block_no, line_no, _ in words:
       # New line if block or line number changes
-      if (block_no, line_no) != (prev[5], prev[6]):
-         lines.append(' '.join(current_line))
+      if block_no != prev_block or line_no != prev_line:
+         if current_line:
+            lines.append(' '.join(current_line))
          current_line = [text]
-         prev = w
-         continue
-      
+         prev_block, prev_line = block_no, line_no
+
       # Same line: use a FIXED gap threshold instead of proportion-based
-      prev_x1 = prev[2]
-      gap = x0 - prev_x1
-      
       # Use a very low threshold - gaps between real words are ~2.2-3.0,
       # gaps between separate sections are negative (column jumps)
       # Use 2.0 to force separation at most gaps
-      if gap >= 2.0:
+      elif x0 - prev_x1 >= 2.0:
          current_line.append(text)
       else:
-         current_line[-1] = current_line[-1] + text
+         current_line[-1] += text
       
-      prev = w
+      prev_x1 = x1
    
    if current_line:
       lines.append(' '.join(current_line))
    
    text = '\n'.join(lines)
+   chapter, section, question, answer = page_flags(text)
 
    return PageRecord(
       id=IDFactory.page_id(book_id, pymu.number + 1),
@@ -160,12 +210,65 @@ def words_to_text(
       pdf_page_number=pymu.number + 1,
       text=text,
       word_count=len(words),
-      has_chapter=has_chapter(text),
-      has_section=has_section(text),
-      has_question=has_question(text),
-      has_answer=has_answer(text)
+      has_chapter=chapter,
+      has_section=section,
+      has_question=question,
+      has_answer=answer
    )
 
+""" -------------------------------------------------------------------------------------------------------- """
+PRACTICE_KEYWORDS = (
+   "practice exercises",
+   "practice problems",
+   "practice questions",
+   "review questions",
+   "review problems",
+   "review exercises",
+   "self-test questions",
+   "self-test problems",
+   "self test questions",
+   "homework problems",
+   "homework questions",
+   "homework exercises",
+   "end of chapter exercises",
+   "end of chapter problems",
+   "chapter exercises",
+   "suggested exercises",
+   "suggested problems",
+   "worked examples",
+   "study questions",
+   "discussion questions",
+   "comprehension questions",
+   "conceptual questions",
+   "thought questions",
+)
+SOLUTION_KEYWORDS = (
+   "exercise solutions",
+   "answer key",
+   "answer keys",
+   "solutions to exercises",
+   "solutions to problems",
+   "solution to exercises",
+   "solution to problems",
+   "selected answers",
+   "selected solutions",
+   "answers to exercises",
+   "answers to problems",
+   "answers to questions",
+   "hints and solutions",
+   "solutions to selected",
+   "answers to selected",
+   "solutions to odd-numbered",
+   "answers to odd-numbered",
+   "solutions manual",
+)
+# Every practice keyword/heading contains one of PRACTICE_TRIGGERS and every solution keyword/heading
+# one of SOLUTION_TRIGGERS, so pages without them skip the keyword loop and heading regex entirely
+PRACTICE_TRIGGERS = ('exercise', 'problem', 'question', 'worked examples')
+SOLUTION_TRIGGERS = ('solution', 'answer')
+PRACTICE_HEADING_RE = re.compile(r'(?m)^(Exercises?|Problems?|Questions?)\s*$', re.IGNORECASE)
+SOLUTION_HEADING_RE = re.compile(r'(?m)^(Solutions?|Answers?)\s*$', re.IGNORECASE)
+
 """ -------------------------------------------------------------------------------------------------------- """
 """
 Identify section boundaries based on page text and simple heuristics.
@@ -176,80 +279,92 @@ Returns:
    Set of section keys
 """
 def group_sections_per_page(page: PageRecord) -> Set[str]:
-   import re
    text = page.text or ''
    text_lower = text.lower()
    section_ids: Set[str] = set()
 
    # --- Practice / exercise detection ---
-   practice_keywords = [
-      "practice exercises",
-      "practice problems",
-      "practice questions",
-      "review questions",
-      "review problems",
-      "review exercises",
-      "self-test questions",
-      "self-test problems",
-      "self test questions",
-      "homework problems",
-      "homework questions",
-      "homework exercises",
-      "end of chapter exercises",
-      "end of chapter problems",
-      "chapter exercises",
-      "suggested exercises",
-      "suggested problems",
-      "worked examples",
-      "study questions",
-      "discussion questions",
-      "comprehension questions",
-      "conceptual questions",
-      "thought questions",
-   ]
-   for kw in practice_keywords:
-      if kw in text_lower:
-         section_ids.add(IDFactory.section_id(page.book_id, "practice exercises"))
-         break
-
-   # Standalone headings: "Exercises", "Problems", "Questions" on their own line
-   if IDFactory.section_id(page.book_id, "practice exercises") not in section_ids:
-      if re.search(r'(?m)^(Exercises?|Problems?|Questions?)\s*$', text, re.IGNORECASE):
+   # Keywords first, then standalone headings: "Exercises", "Problems", "Questions" on their own line
+   if any(t in text_lower for t in PRACTICE_TRIGGERS):
+      if any(kw in text_lower for kw in PRACTICE_KEYWORDS) or PRACTICE_HEADING_RE.search(text):
          section_ids.add(IDFactory.section_id(page.book_id, "practice exercises"))
 
    # --- Solution / answer detection ---
-   solution_keywords = [
-      "exercise solutions",
-      "answer key",
-      "answer keys",
-      "solutions to exercises",
-      "solutions to problems",
-      "solution to exercises",
-      "solution to problems",
-      "selected answers",
-      "selected solutions",
-      "answers to exercises",
-      "answers to problems",
-      "answers to questions",
-      "hints and solutions",
-      "solutions to selected",
-      "answers to selected",
-      "solutions to odd-numbered",
-      "answers to odd-numbered",
-      "solutions manual",
-   ]
-   for kw in solution_keywords:
-      if kw in text_lower:
-         section_ids.add(IDFactory.section_id(page.book_id, "exercise solutions"))
-         break
-
-   # Standalone headings: "Solutions", "Answers" on their own line
-   if IDFactory.section_id(page.book_id, "exercise solutions") not in section_ids:
-      if re.search(r'(?m)^(Solutions?|Answers?)\s*$', text, re.IGNORECASE):
+   # Keywords first, then standalone headings: "Solutions", "Answers" on their own line
+   if any(t in text_lower for t in SOLUTION_TRIGGERS):
+      if any(kw in text_lower for kw in SOLUTION_KEYWORDS) or SOLUTION_HEADING_RE.search(text):
          section_ids.add(IDFactory.section_id(page.book_id, "exercise solutions"))
 
    return section_ids
 
+""" -------------------------------------------------------------------------------------------------------- """
+"""
+Build one PageRecord and assign its section_ids.
+Args:
+   pymu - PyMuPDF page object
+   book_id - Book ID the page belongs to
+Returns:
+   PageRecord object
+"""
+def extract_page(pymu, book_id: str) -> PageRecord:
+   page = words_to_text(pymu, book_id=book_id)
+   sections = group_sections_per_page(page)
+   page.section_ids = {s for s in sections if s is not None}
+   return page
+
+# Each worker process opens the PDF once and reuses it for every batch it is handed
+_worker_pdf = None
+
+def _init_page_worker(pdf_path: str):
+   global _worker_pdf
+   _worker_pdf = fitz.open(pdf_path, filetype="pdf")
+
+def _extract_page_batch(page_range: range, book_id: str) -> List[PageRecord]:
+   pymu_pages = _worker_pdf.pages(page_range.start, page_range.stop)
+   return [extract_page(pymu, book_id) for pymu in pymu_pages]
+
+""" -------------------------------------------------------------------------------------------------------- """
+"""
+Extract every page of a PDF, spreading contiguous page batches across a process pool. Small
+documents (or single-core machines) are extracted in-process to skip the pool startup cost.
+MuPDF extraction stops scaling at around 4-6 processes, so the pool is capped at max_workers.
+Workers only send back PageRecords; serializing them stays with the caller so page text
+crosses the process boundary once.
+Args:
+   pdf_path - Path to the PDF
+   num_pages - Number of pages in the PDF
+   book_id - Book ID the pages belong to
+   pages_per_batch - Pages handed to a worker at a time
+   max_workers - Upper bound on worker processes
+Yields:
+   PageRecord objects in page order
+"""
+def extract_pages(
+      pdf_path: Path,
+      num_pages: int,
+      book_id: str,
+      pages_per_batch: int = 16,
+      max_workers: int = 4,
+) -> Iterator[PageRecord]:
+   batches = [range(start, min(start + pages_per_batch, num_pages))
+              for start in range(0, num_pages, pages_per_batch)]
+   num_workers = min(os.cpu_count() or 1, max_workers, len(batches))
+
+   if num_workers <= 1:
+      with fitz.open(pdf_path, filetype="pdf") as pdf:
+         for pymu in pdf:
+            yield extract_page(pymu, book_id)
+      return
+
+   with ProcessPoolExecutor(
+      max_workers=num_workers,
+      initializer=_init_page_worker,
+      initargs=(str(pdf_path),)
+   ) as executor:
+      # map() yields batch results in submission order, so pages come back in order
+      for batch in executor.map(_extract_page_batch, batches, repeat(book_id)):
+         yield from batch
+
 """ -------------------------------------------------------------------------------------------------------- """
 """
 Converts the PDF to JSONL format, one page per line. PageRecords and DocumentRecord stored as two
@@ -319,48 +434,55 @@ def convert_pdf(pdf_path: Path, output_dir_name: str = None) -> Tuple[str, Path]
    # Read PDF
    page_out_file = output_dir / f"{base_name}_PageRecords"
    TOC_SCAN_PAGES = 60
+   PAGE_WRITE_BUFFER = 1 << 20
+   PAGE_FLUSH_EVERY = 1000
    toc_pages: List[PageRecord] = []
 
-   with fitz.open(pdf_path) as pdf:
-      with open(page_out_file, 'w', encoding='utf-8') as outf:
-         for page_idx in range(len(pdf)):
-
-            # 1) Build PageRecord object
-            page = words_to_text(pdf[page_idx], book_id=book.id)
-            if page_idx < TOC_SCAN_PAGES:
-               toc_pages.append(page)
-
-            # 2) Add page.id to book.page_ids
-            book.page_ids.add(page.id)
-
-            # 3) Add section_ids to page record based on heuristics
-            sections = group_sections_per_page(page)
-            page.section_ids = {s for s in sections if s is not None}
-
-            # 4) Dump PageRecord to DocumentRecord JSONL file
-            d = to_jsonable(page)
-            outf.write(json.dumps(d, ensure_ascii=False) + '\n')
-            
-            # 5) Update num_pages and num_words in book record as we go
-            page_count += 1
-            book.num_words += page.word_count
-            book.num_pages = page_count
-
-            # 6) Update remaining book metadata
-            book.section_ids.update(page.section_ids)
-            book.page_ids.add(page.id)
-            book.num_sections = len(book.section_ids)  # Count unique non-empty sections
-            book.num_questions = 0     # TODO: Update with actual question count
-            book.num_answers = 0       # TODO: Update with actual answer count
-            book.references = []       # TODO: Update with actual references
-            book.related_readings = [] # TODO: Update with actual related readings
-            
-            now = time.perf_counter()
-            if now - last_print_time >= DRAW_EVERY_SEC:
-               draw_progress(page_count, len(pdf), now - t0)
-               last_print_time = now
-
-            book.num_pages = page_count
+   with fitz.open(pdf_path, filetype="pdf") as pdf:
+      num_pages = len(pdf)
+
+   # Collected locally and packed into the book's id sets once the loop is done
+   page_ids: List[str] = []
+   section_ids: Set[str] = set()
+
+   # 1 MiB buffer: pages are appended as small writes, flushed to disk in large chunks
+   with open(page_out_file, 'wb', buffering=PAGE_WRITE_BUFFER) as outf:
+      pages = extract_pages(pdf_path, num_pages, book.id)
+      for page_idx, page in enumerate(pages):
+
+         # 1) PageRecord built and section_ids assigned by extract_page (possibly in a worker)
+         if page_idx < TOC_SCAN_PAGES:
+            toc_pages.append(page)
+
+         # 2) Record page.id for book.page_ids
+         page_ids.append(page.id)
+
+         # 3) Dump PageRecord to DocumentRecord JSONL file
+         outf.write(page_to_json_bytes(page))
+         if page_idx % PAGE_FLUSH_EVERY == PAGE_FLUSH_EVERY - 1:
+            outf.flush()   # Checkpoint so a long conversion leaves a readable partial file
+         
+         # 4) Update num_words in book record as we go
+         page_count += 1
+         book.num_words += page.word_count
+
+         # 5) Collect the page's sections
+         section_ids |= page.section_ids
+         
+         now = time.perf_counter()
+         if now - last_print_time >= DRAW_EVERY_SEC:
+            draw_progress(page_count, num_pages, now - t0)
+            last_print_time = now
+
+   # Remaining book metadata only depends on the finished page loop
+   book.num_pages = page_count
+   book.page_ids = {IDFactory.to_bytes(p) for p in page_ids}
+   book.section_ids = {IDFactory.to_bytes(s) for s in section_ids}
+   book.num_sections = len(book.section_ids)  # Count unique non-empty sections
+   book.num_questions = 0     # TODO: Update with actual question count
+   book.num_answers = 0       # TODO: Update with actual answer count
+   book.references = []       # TODO: Update with actual references
+   book.related_readings = [] # TODO: Update with actual related readings
 
    # --- Simple chapter detection by scanning PageRecords ---
    print(f"\n{'='*70}")
@@ -416,8 +538,8 @@ def convert_pdf(pdf_path: Path, output_dir_name: str = None) -> Tuple[str, Path]
    
    # Write DocumentRecord to same directory
    book_out_file = output_dir / f"{base_name}_DocumentRecord"
-   with open(book_out_file, 'w', encoding='utf-8') as outf:
-      outf.write(json.dumps(to_jsonable(book), indent=2, ensure_ascii=False, sort_keys=True))
+   with open(book_out_file, 'wb') as outf:
+      outf.write(orjson.dumps(to_jsonable(book), option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
 
    # Print closing message
    print(f"\n\n{'=' * 70}")
@@ -435,7 +557,8 @@ def convert_pdf(pdf_path: Path, output_dir_name: str = None) -> Tuple[str, Path]
       base_name,
       str(output_dir),
       page_count=book.num_pages,
-      word_count=book.num_words
+      word_count=book.num_words,
+      book_id=book.id
    )
     
    return (book.id, output_dir)
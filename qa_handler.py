@@ -3,9 +3,10 @@ from __future__ import annotations
 
 import re
 import uuid
-import json
+import orjson
 from pathlib import Path
-from typing import List, Optional, Tuple, Set, Dict, TYPE_CHECKING
+from functools import lru_cache
+from typing import List, Optional, Tuple, Set, Dict, Union, TYPE_CHECKING
 from dataclasses import dataclass, asdict, is_dataclass, field
 from pdf_to_jsonl import SectionRecord, PageRecord
 
@@ -16,14 +17,20 @@ from id_factory import IDFactory
 
 """ -------------------------------------------------------------------------------------------------------- """
 """                                      REGEX AND HELPER FUNCTIONS                                          """
-ANSWER_BLOCK_SPLIT = re.compile(r"(?=^\s*\d+\.\s+The correct answer is)", re.MULTILINE)
-ANSWER_START = re.compile(r"^\s*(\d+)\.\s+The correct answer is\s*\(([A-Z])\)\.\s*(.*)", re.DOTALL)
+# Each match starts a numbered block that runs up to the next match (answers without a
+# "(X)." choice still end the previous block but are skipped). Leading whitespace is limited to
+# the number's own line: "^\s*" retried from every line start of a long blank run is quadratic,
+# and the blank lines it would have absorbed are stripped from the blocks either way
+ANSWER_BLOCK_START = re.compile(r"^[^\S\n]*(\d+)\.\s+The correct answer is(?:\s*\(([A-Z])\)\.)?", re.MULTILINE)
 
-QUESTION_BLOCK_SPLIT = re.compile(r"(?=^\s*\d+\.\s)", re.MULTILINE)
+QUESTION_BLOCK_START = re.compile(r"^[^\S\n]*(\d+)\.\s", re.MULTILINE)
 QUESTION_START = re.compile(r"^\s*(\d+)\.\s*(.*)", re.DOTALL)
+QUESTION_PREFIX = re.compile(r"^\s*\d+\.\s")
 
 CHAPTER_RE = re.compile(r"(Chapter\s+\d+)", re.IGNORECASE)
 
+# Only a handful of distinct section titles per book, looked up once per question and answer
+@lru_cache(maxsize=256)
 def chapter_key(title: str) -> str:
    m = CHAPTER_RE.search(title or "")
    return m.group(1).title() if m else "Chapter ?"
@@ -37,14 +44,14 @@ def qa_id_from_problem_key(problem_key: str) -> str:
    return str(uuid.uuid5(uuid.NAMESPACE_URL, problem_key))
 
 """ -------------------------------------------------------------------------------------------------------- """
-@dataclass
+@dataclass(slots=True)
 class QuestionRecord:
    id: Optional[str]=None                              # Individual question ID (UUID)
    qa_id: str=None                                     # Unique Q&A pair ID (UUID)
    book_id: str=None                                   # Book ID this question belongs to
    chapter: str=None                                   # Chapter the question is under
-   section_labels: Set[str]=field(default_factory=set) # Section label this question belongs to (e.g. "1.2")
-   section_titles: Set[str]=field(default_factory=set) # Section title this question belongs to (e.g. "Section 1.2: Data Structures")
+   section_labels: Tuple[str, ...]=()                  # Section label this question belongs to (e.g. "1.2")
+   section_titles: Tuple[str, ...]=()                  # Section title this question belongs to (e.g. "Section 1.2: Data Structures")
    pdf_page: int | None=None                           # PDF page number where the question is located, earliest page if multiple
    problem_key: str=None                               # Unique problem key this question belongs to (e.g. "Section 1.2#3")
    question_number: Optional[int]=None                 # Question number extracted from text (e.g. "1" for "Problem 1.2")
@@ -52,15 +59,32 @@ class QuestionRecord:
    question_embedding: Optional[List[float]]=None      # Optional text embedding for the question (e.g. from a language model)
    page_ids: Set[str]=field(default_factory=set)       # Set of page IDs this question appears in (for traceability)
 
+   def to_dict(self) -> dict:
+      """Convert to dictionary for JSON serialization (one pass, no asdict deep copy)."""
+      return {
+         "id": self.id,
+         "qa_id": self.qa_id,
+         "book_id": self.book_id,
+         "chapter": self.chapter,
+         "section_labels": sorted(self.section_labels),
+         "section_titles": sorted(self.section_titles),
+         "pdf_page": self.pdf_page,
+         "problem_key": self.problem_key,
+         "question_number": self.question_number,
+         "question_text": self.question_text,
+         "question_embedding": self.question_embedding,
+         "page_ids": sorted(self.page_ids),
+      }
+
 """ -------------------------------------------------------------------------------------------------------- """
-@dataclass
+@dataclass(slots=True)
 class AnswerRecord:
    id: Optional[str]=None                              # Individual answer ID (UUID)
    qa_id: Optional[str]=None                           # Unique Q&A pair ID (UUID)
    book_id: str=None                                   # Book ID this answer belongs to
    chapter: str=None                                   # Chapter the answer is under
-   section_labels: Set[str]=field(default_factory=set) # Section label this answer belongs to (e.g. "1.2")
-   section_titles: Set[str]=field(default_factory=set) # Section title this answer belongs to (e.g. "Section 1.2: Data Structures")
+   section_labels: Tuple[str, ...]=()                  # Section label this answer belongs to (e.g. "1.2")
+   section_titles: Tuple[str, ...]=()                  # Section title this answer belongs to (e.g. "Section 1.2: Data Structures")
    pdf_page: int | None=None                           # PDF page number where the answer is located, earliest page if multiple
    problem_key: str=None                               # Unique problem key this answer belongs to (e.g. "Section 1.2#3")
    answer_number: Optional[int]=None                   # Answer number extracted from text (e.g. "1" for "Problem 1.2")
@@ -70,6 +94,25 @@ class AnswerRecord:
    answer_confidence: Optional[List[float]] = None     # Optional confidence score for the answer (e.g. from a language model)
    page_ids: Set[str]=field(default_factory=set)       # Set of page IDs this answer appears in (for traceability)
 
+   def to_dict(self) -> dict:
+      """Convert to dictionary for JSON serialization (one pass, no asdict deep copy)."""
+      return {
+         "id": self.id,
+         "qa_id": self.qa_id,
+         "book_id": self.book_id,
+         "chapter": self.chapter,
+         "section_labels": sorted(self.section_labels),
+         "section_titles": sorted(self.section_titles),
+         "pdf_page": self.pdf_page,
+         "problem_key": self.problem_key,
+         "answer_number": self.answer_number,
+         "answer_choice": self.answer_choice,
+         "answer_text": self.answer_text,
+         "answer_embedding": self.answer_embedding,
+         "answer_confidence": self.answer_confidence,
+         "page_ids": sorted(self.page_ids),
+      }
+
 """ -------------------------------------------------------------------------------------------------------- """
 """
 Convert a dataclass object to a JSONL record (one line of JSON)
@@ -79,6 +122,8 @@ Returns:
    A JSON string representing the object, suitable for writing to a JSONL file
 """
 def to_jsonable(obj):
+   if hasattr(obj, "to_dict"):
+      return obj.to_dict()
    if is_dataclass(obj):
       obj = asdict(obj)
    if isinstance(obj, dict):
@@ -95,27 +140,161 @@ Page to section lookup
 Args:
    struct_nodes: List of SectionRecords with pdf_start and pdf_end page numbers
 Returns:
-   A list indexed by page number (1-based) containing section info for that
-   page, or None if no section info
+   A dict mapping page number (1-based) to section info, for pages covered by a section
 """
-def lookup_section(sec_recs: List[SectionRecord]) -> list:
+def lookup_section(sec_recs: List[SectionRecord]) -> Dict[int, Dict]:
    # Prefer shorter sections first then longer
    sections = list(sec_recs)  # Make a copy to avoid modifying original
    max_page = max(s.page_end for s in sections)
    sections_sorted = sorted(sections, key=lambda s: (s.page_end - s.page_start, s.page_start))
 
-   lookup = [None] * (max_page + 1)  # 1-based indexing
+   lookup = {}
+   filled = bytearray(max_page + 1)  # 1 where lookup already holds a (shorter) section
 
    for s in sections_sorted:
-      for p in range(s.page_start, s.page_end + 1):
-         if p <= max_page and lookup[p] is None:
-            lookup[p] = {
-               "section_label": s.section_label,
-               "section_title": s.section_title
-            }
+      info = {
+         "section_label": s.section_label,
+         "section_title": s.section_title
+      }
+      # Fill each still-empty run of the section's pages in one update
+      stop = s.page_end + 1
+      if stop <= s.page_start:
+         continue
+      start = filled.find(0, s.page_start, stop)
+      while start >= 0:
+         end = filled.find(1, start, stop)
+         if end < 0:
+            end = stop
+         lookup.update(dict.fromkeys(range(start, end), info))
+         filled[start:end] = b'\x01' * (end - start)
+         start = filled.find(0, end, stop)
 
    return lookup
 
+""" -------------------------------------------------------------------------------------------------------- """
+r"""
+Split one practice page into numbered question blocks
+Args:
+   page: The PageRecord to split
+   sec: The page's section info from the lookup
+   book_id: Book ID used for each block's problem key
+   carry: The last question block so far, extended when the page continues it
+   questions: List the new question blocks are appended to
+Returns:
+   The last question block after this page (the carry for the next practice page)
+"""
+def _extract_question_blocks(page: PageRecord, sec: Dict, book_id: str, carry: Optional[Dict], questions: List[Dict]) -> Optional[Dict]:
+   text = page.text or ""
+   starts = list(QUESTION_BLOCK_START.finditer(text))
+   ends = [m.start() for m in starts[1:]] + [len(text)]
+   blocks = [(int(m.group(1)), text[m.start():end].strip()) for m, end in zip(starts, ends)]
+
+   # Text ahead of the first numbered block
+   lead = text[:starts[0].start()].strip() if starts else text.strip()
+   if lead:
+      m = QUESTION_START.match(lead)
+      blocks.insert(0, (int(m.group(1)) if m else None, lead))
+
+   # Check for multi-page questions
+   if blocks and not QUESTION_PREFIX.match(blocks[0][1]):
+      if carry:
+            carry["raw"] += "\n" + blocks[0][1]
+            carry["page_ids"].add(page.id)
+            blocks = blocks[1:]
+
+   for qnum, body in blocks:
+      if qnum is None:
+         continue
+
+      section_title = sec["section_title"]
+      carry = {
+         "qnum": qnum,
+         "problem_key": canonical_problem_key(book_id, chapter_key(section_title), qnum),
+         "raw": body,
+         "page_ids": {page.id},
+         "pdf_pages": {page.pdf_page_number},
+         "section_title": section_title,
+         "section_label": sec["section_label"],
+      }
+      questions.append(carry)
+
+   return carry
+
+""" -------------------------------------------------------------------------------------------------------- """
+r"""
+Split one solutions page into numbered answer blocks
+Args:
+   page: The PageRecord to split
+   sec: The page's section info from the lookup
+   book_id: Book ID used for each block's problem key
+   carry: The last answer block so far, extended when the page continues it
+   answers: List the new answer blocks are appended to
+Returns:
+   The last answer block after this page (the carry for the next solutions page)
+"""
+def _extract_answer_blocks(page: PageRecord, sec: Dict, book_id: str, carry: Optional[Dict], answers: List[Dict]) -> Optional[Dict]:
+   text = page.text or ""
+   starts = list(ANSWER_BLOCK_START.finditer(text))
+   ends = [m.start() for m in starts[1:]] + [len(text)]
+
+   # Check for multi-page answers (text ahead of the first numbered block)
+   lead = text[:starts[0].start()].strip() if starts else text.strip()
+   if lead and carry:
+      carry["raw"] += "\n" + lead
+      carry["page_ids"].add(page.id)
+
+   for m, end in zip(starts, ends):
+      choice = m.group(2)
+      if not choice:
+         continue
+
+      anum = int(m.group(1))
+      rest = text[m.end():end].strip()
+      body = text[m.start():end].strip()
+
+      section_title = sec["section_title"]
+      carry = {
+            "anum": anum,
+            "problem_key": canonical_problem_key(book_id, chapter_key(section_title), anum),
+            "choice": choice,
+            "raw": body,
+            "answer_text": rest if rest else body,
+            "page_ids": {page.id},
+            "pdf_pages": {page.pdf_page_number},
+            "section_title": section_title,
+            "section_label": sec.get("section_label"),
+      }
+      answers.append(carry)
+
+   return carry
+
+""" -------------------------------------------------------------------------------------------------------- """
+r"""
+Extract question and answer blocks in a single pass over the pages, sending "Practice Exercises"
+pages to the question splitter and "Solutions" pages to the answer splitter
+Args:
+   pages: List of PageRecord objects in reading order
+   lookup: Section info keyed by page number (see build_lookup_from_pages)
+   book_id: Book ID used for the problem keys
+Returns:
+   A tuple of (question blocks, answer blocks)
+"""
+def extract_qa_blocks(pages: List[PageRecord], lookup, book_id: str) -> Tuple[List[Dict], List[Dict]]:
+   questions, answers = [], []
+   q_carry = a_carry = None
+
+   for page in pages:
+      sec = lookup.get(page.pdf_page_number)
+      if not sec:
+         continue
+      title = sec.get("section_title") or ""
+      if "Practice Exercises" in title:
+         q_carry = _extract_question_blocks(page, sec, book_id, q_carry, questions)
+      if "Solutions" in title:
+         a_carry = _extract_answer_blocks(page, sec, book_id, a_carry, answers)
+
+   return questions, answers
+
 """ -------------------------------------------------------------------------------------------------------- """
 r"""
 Extract questions from text using regex patterns
@@ -126,48 +305,11 @@ Returns:
    A list of QuestionRecord objects connected to their corresponding AnswerRecord
 """
 def extract_questions(pages: List[PageRecord], lookup, book_id: str) -> List[Dict]:
-   # 1) Gather all practice text in reading order
-   chunks = []
+   questions, carry = [], None
    for page in pages:
-      sec = lookup[page.pdf_page_number] if page.pdf_page_number < len(lookup) else None
-      if not sec:
-         continue
-      if "Practice Exercises" not in (sec.get("section_title") or ""):
-         continue
-      chunks.append((page, page.text or ""))
-
-   # 2) Concatenate with page markers for later attribution
-   questions = []
-   carry = None
-
-   for page, text in chunks:
-      parts = QUESTION_BLOCK_SPLIT.split(text)
-      parts = [p.strip() for p in parts if p.strip()]
-
-      # Check for multi-page questions
-      if parts and not re.match(r"^\s*\d+\.\s", parts[0]):
-         if carry:
-               carry["raw"] += "\n" + parts[0]
-               carry["page_ids"].add(page.id)
-               parts = parts[1:]
-
-      for part in parts:
-         m = QUESTION_START.match(part)
-         if not m:
-            continue
-         qnum = int(m.group(1))
-         body = part.strip()
-
-         carry = {
-            "qnum": qnum,
-            "raw": body,
-            "page_ids": {page.id},
-            "pdf_pages": {page.pdf_page_number},
-            "section_title": lookup[page.pdf_page_number]["section_title"],
-            "section_label": lookup[page.pdf_page_number]["section_label"],
-         }
-         questions.append(carry)
-   
+      sec = lookup.get(page.pdf_page_number)
+      if sec and "Practice Exercises" in (sec.get("section_title") or ""):
+         carry = _extract_question_blocks(page, sec, book_id, carry, questions)
    return questions
 
 """ -------------------------------------------------------------------------------------------------------- """
@@ -180,53 +322,11 @@ Returns:
    A list of AnswerRecord objects connected to their corresponding QuestionRecord
 """
 def extract_answers(pages, lookup, book_id: str) -> List[Dict]:
-   # 1) Gather all practice text in reading order
-   chunks = []
+   answers, carry = [], None
    for page in pages:
-      sec = lookup[page.pdf_page_number] if page.pdf_page_number < len(lookup) else None
-      if not sec:
-         continue
-      title = sec.get("section_title") or ""
-      if "Solutions" not in title:
-         continue
-      chunks.append((page, page.text or ""))
-
-   # 2) Concatenate with page markers for later attribution
-   answers = []
-   carry = None
-
-   for page, text in chunks:
-      parts = ANSWER_BLOCK_SPLIT.split(text)
-      parts = [p.strip() for p in parts if p.strip()]
-
-      if parts and not re.match(r"^\s*\d+\.\s+The correct answer is", parts[0]):
-         if carry:
-               carry["raw"] += "\n" + parts[0]
-               carry["page_ids"].add(page.id)
-               parts = parts[1:]
-         
-      for part in parts:
-         m = ANSWER_START.match(part)
-         if not m:
-            continue
-
-         anum = int(m.group(1))
-         choice = m.group(2)
-         rest = (m.group(3) or "").strip()
-         body = part.strip()
-
-         carry = {
-               "anum": anum,
-               "choice": choice,
-               "raw": body,
-               "answer_text": rest if rest else body,
-               "page_ids": {page.id},
-               "pdf_pages": {page.pdf_page_number},
-               "section_title": lookup[page.pdf_page_number]["section_title"],
-               "section_label": lookup[page.pdf_page_number].get("section_label"),
-         }
-         answers.append(carry)
-
+      sec = lookup.get(page.pdf_page_number)
+      if sec and "Solutions" in (sec.get("section_title") or ""):
+         carry = _extract_answer_blocks(page, sec, book_id, carry, answers)
    return answers
 
 """ -------------------------------------------------------------------------------------------------------- """
@@ -239,32 +339,30 @@ Returns:
    None (the function modifies the input lists in place to connect questions and answers based on their problem keys)
 """
 def match_questions_and_answers(q_blocks, a_blocks, book_id: str) -> Tuple[List[QuestionRecord], Optional[List[AnswerRecord]]]:
-   # Map answers by canonical key
-   a_map = {}
-   for a in a_blocks:
-      chap = chapter_key(a["section_title"])
-      key = canonical_problem_key(book_id, chap, a["anum"])
-      a_map[key] = a
+   # Map answers by canonical key (computed once per block during extraction)
+   a_map = {a["problem_key"]: a for a in a_blocks}
 
    questions_out = []
    answers_out = []
 
+   # Random record IDs, enough for every question plus a matched answer each
+   new_ids = IDFactory.random_ids(2 * len(q_blocks))
+
    for q in q_blocks:
-      chap = chapter_key(q["section_title"])
-      key = canonical_problem_key(book_id, chap, q["qnum"])
+      key = q["problem_key"]
       qa_id = qa_id_from_problem_key(key)
 
       # Build QuestionRecord
       qrec = QuestionRecord(
-         id=str(uuid.uuid4()),
+         id=next(new_ids),
          qa_id=qa_id,
          book_id=book_id,
          problem_key=key,
          question_number=q["qnum"],
          question_text=q["raw"],
          page_ids=set(q["page_ids"]),
-         section_titles={q["section_title"]},
-         section_labels={q["section_label"]} if q["section_label"] else set(),
+         section_titles=(q["section_title"],),
+         section_labels=(q["section_label"],) if q["section_label"] else (),
       )
       questions_out.append(qrec)
 
@@ -272,7 +370,7 @@ def match_questions_and_answers(q_blocks, a_blocks, book_id: str) -> Tuple[List[
       a = a_map.get(key)
       if a:
          arec = AnswerRecord(
-            id=str(uuid.uuid4()),
+            id=next(new_ids),
             qa_id=qa_id,
             book_id=book_id,
             problem_key=key,
@@ -280,8 +378,8 @@ def match_questions_and_answers(q_blocks, a_blocks, book_id: str) -> Tuple[List[
             answer_choice=a["choice"],
             answer_text=a["raw"],
             page_ids=set(a["page_ids"]),
-            section_titles={q["section_title"]},
-            section_labels={q["section_label"]} if a["section_label"] else set(),
+            section_titles=(q["section_title"],),
+            section_labels=(q["section_label"],) if a["section_label"] else (),
          )
          answers_out.append(arec)
 
@@ -302,12 +400,12 @@ Build a section lookup from PageRecords by identifying sections from their conte
 Args:
    pages: List of PageRecord objects
 Returns:
-   A lookup list indexed by page number, containing section info
+   A lookup dict keyed by page number, containing section info
 """
-def build_lookup_from_pages(pages: List[PageRecord]) -> list:
+def build_lookup_from_pages(pages: List[PageRecord]) -> Dict[int, Dict]:
    """
    Build a lookup table from pages by finding 'Practice Exercises' and 'Solutions' sections.
-   Returns a list indexed by page number (1-based) with section info.
+   Returns a dict mapping page number (1-based) to section info, only for pages in those sections.
    """
    # Find which pages contain which sections
    page_sections = {}
@@ -322,21 +420,13 @@ def build_lookup_from_pages(pages: List[PageRecord]) -> list:
             "section_label": "practice",
             "section_title": "Practice Exercises"
          }
-      elif "exercise solutions" in text_lower or "solutions" in text_lower:
+      elif "solutions" in text_lower:  # Also covers "exercise solutions"
          page_sections[page_num] = {
             "section_label": "solutions", 
             "section_title": "Exercise Solutions"
          }
    
-   # Build lookup array
-   if page_sections:
-      max_page = max(page_sections.keys())
-      lookup = [None] * (max_page + 1)
-      for page_num, section_info in page_sections.items():
-         lookup[page_num] = section_info
-      return lookup
-   
-   return []
+   return page_sections
 
 """ -------------------------------------------------------------------------------------------------------- """
 """
@@ -350,28 +440,19 @@ def extract_qas(output_path: Path, book_id: str) -> Tuple[Path, Path]:
    # 1) Load PageRecords from JSONL file
    pages = []
    
-   with open(output_path, 'r', encoding='utf-8') as f:
+   with open(output_path, 'rb') as f:
       for line in f:
          if line.strip():
-            record = json.loads(line)
-            # Reconstruct PageRecord from JSON
-            page = PageRecord(
-               id=record.get('id'),
-               book_id=record.get('book_id'),
-               pdf_page_number=record.get('pdf_page_number'),
-               real_page_number=record.get('real_page_number'),
-               text=record.get('text', ''),
-               word_count=record.get('word_count', 0),
-               section_ids=set(record.get('section_ids', []))
-            )
-            pages.append(page)
+            record = orjson.loads(line)
+            # Reconstruct PageRecord from JSON (field names match PageRecord.to_dict)
+            record['section_ids'] = set(record.get('section_ids', ()))
+            pages.append(PageRecord(**record))
    
    # 2) Build section lookup from pages
    lookup = build_lookup_from_pages(pages)
    
    # 3) Extract questions and answers
-   questions = extract_questions(pages, lookup, book_id)
-   answers = extract_answers(pages, lookup, book_id)
+   questions, answers = extract_qa_blocks(pages, lookup, book_id)
    
    # 4) Match questions with answers
    questions_out, answers_out = match_questions_and_answers(questions, answers, book_id)
@@ -381,6 +462,21 @@ def extract_qas(output_path: Path, book_id: str) -> Tuple[Path, Path]:
    
    return questions_path, answers_path 
 
+""" -------------------------------------------------------------------------------------------------------- """
+"""
+Write records to a JSONL file, one joined write per batch of lines (batches cap peak memory)
+Args:
+   records: List of QuestionRecord or AnswerRecord objects
+   path: Output JSONL path
+"""
+JSONL_WRITE_BATCH = 10_000
+
+def write_records_jsonl(records: List[Union[QuestionRecord, AnswerRecord]], path: Path) -> None:
+   with open(path, 'wb') as f:
+      for start in range(0, len(records), JSONL_WRITE_BATCH):
+         batch = records[start:start + JSONL_WRITE_BATCH]
+         f.write(b'\n'.join([orjson.dumps(r.to_dict()) for r in batch]) + b'\n')
+
 """ -------------------------------------------------------------------------------------------------------- """
 """
 Save extracted questions and answers to JSONL files in /questions and /answers folders
@@ -393,7 +489,6 @@ Returns:
 """
 def save_qa_extraction(questions: List[QuestionRecord], answers: List[AnswerRecord], output_path: Path) -> Tuple[Path, Path]:
    from pathlib import Path
-   from pdf_to_jsonl import to_jsonable
 
    # Get base filename without extension
    base_name = output_path.stem  # e.g., "eecs_test3" from "eecs_test3.jsonl"
@@ -410,24 +505,19 @@ def save_qa_extraction(questions: List[QuestionRecord], answers: List[AnswerReco
    print(f"  Answers: {answers_output}\n")
 
    # Save questions
-   with open(questions_output, 'w', encoding='utf-8') as f:
-      for q in questions:
-         record = to_jsonable(q)
-         f.write(json.dumps(record, ensure_ascii=False) + '\n')
+   write_records_jsonl(questions, questions_output)
    
    # Save answers
-   with open(answers_output, 'w', encoding='utf-8') as f:
-      for a in answers:
-         record = to_jsonable(a)
-         f.write(json.dumps(record, ensure_ascii=False) + '\n')
+   write_records_jsonl(answers, answers_output)
    
    return questions_output, answers_output
 
 def load_pages(path: Path):
    pages = []
-   with open(path, "r", encoding="utf-8") as f:
+   with open(path, "rb") as f:
       for line in f:
-         data = json.loads(line)
+         data = orjson.loads(line)
+         data['section_ids'] = set(data.get('section_ids', ()))
          pages.append(PageRecord(**data))
    return pages
 
@@ -450,12 +540,8 @@ if __name__ == "__main__":
    print(f"Extracted {len(answers)} answers")
    
 
-   # Write questions
-   with open(q_out_path, "w", encoding="utf-8") as f:
-      json.dump(to_jsonable(questions), f, indent=2)
-
-   # Write answers
-   with open(a_out_path, "w", encoding="utf-8") as f:
-      json.dump(to_jsonable(answers), f, indent=2)
+   # Write questions and answers as JSONL, one record per line
+   write_records_jsonl(questions, q_out_path)
+   write_records_jsonl(answers, a_out_path)
 
    print("\nDone.\n")
\ No newline at end of file
@@ -134,27 +134,39 @@ class QuestionBank:
    name: str='untitled question bank'
    description: Optional[str]=None
 
+   # question_id -> first Question/Answer with that id, kept in step with the lists by the add_* methods
+   _q_index: Dict[str, Question]=field(default_factory=dict, init=False, repr=False, compare=False)
+   _a_index: Dict[str, Answer]=field(default_factory=dict, init=False, repr=False, compare=False)
+
+   def __post_init__(self) -> None:
+      self.reindex()
+
+   """ Rebuild the id indices (needed after assigning to questions/answers directly) """
+   def reindex(self) -> None:
+      self._q_index = {}
+      self._a_index = {}
+      for q in self.questions:
+         self._q_index.setdefault(q.question_id, q)
+      for a in self.answers:
+         self._a_index.setdefault(a.question_id, a)
+
    def add_question(self, question: Question) -> None:
       self.questions.append(question)
+      self._q_index.setdefault(question.question_id, question)
 
    def add_answer(self, answer: Answer) -> None:
       self.answers.append(answer)
+      self._a_index.setdefault(answer.question_id, answer)
 
    def add_question_answer_pair(self, question: Question, answer: Answer) -> None:
-      self.questions.append(question)
-      self.answers.append(answer)
+      self.add_question(question)
+      self.add_answer(answer)
 
    def get_question(self, question_id: str) -> Optional[Question]:
-      for q in self.questions:
-         if q.question_id == question_id:
-            return q
-      return None
+      return self._q_index.get(question_id)
    
    def get_answer(self, question_id: str) -> Optional[Answer]:
-      for a in self.answers:
-         if a.question_id == question_id:
-            return a
-      return None
+      return self._a_index.get(question_id)
    
    def filter_by_topic(self, topic: str) -> List[Question]:
       return [q for q in self.questions if topic in q.topics]
@@ -184,6 +196,7 @@ class QuestionBank:
 
       bank.questions = [Question.from_dict(q) for q in data.get('questions', [])]
       bank.answers = [Answer.from_dict(a) for a in data.get('answers', [])]
+      bank.reindex()
 
       return bank
    
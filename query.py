@@ -3,11 +3,11 @@
 Complete PDF management CLI with conversion logging and regex-based Q&A extraction.
 """
 
-import json
 import sys
 import os
+import orjson
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Set
 from dataclasses import dataclass
 
 from conversion_logger import ConversionLogger, log_new_pdf, log_completed_conversion
@@ -56,15 +56,42 @@ def list_pdfs(pdf_dir: Path) -> List[Path]:
    """Get all PDFs in directory."""
    return sorted(pdf_dir.glob("*.pdf"))
 
-def get_pdf_status(pdf_path: Path, logger: ConversionLogger) -> str:
-   """Get status emoji for a PDF."""
-   if logger.is_converted(pdf_path.stem):
+def count_jsonl_records(path: Path) -> int:
+   """
+   Count the records in a JSONL file written one per line (no blank lines), by counting
+   newlines in raw 1 MB chunks instead of decoding and iterating lines.
+   """
+   count = 0
+   last = b''
+   with open(path, 'rb') as f:
+      for chunk in iter(lambda: f.read(1 << 20), b''):
+         count += chunk.count(b'\n')
+         last = chunk[-1:]
+   if last and last != b'\n':
+      count += 1  # Final record without a trailing newline
+   return count
+
+def list_names(directory: Path) -> Set[str]:
+   """Get the names in a directory with one listing (empty if it doesn't exist)."""
+   try:
+      with os.scandir(directory) as it:
+         return {e.name for e in it}
+   except (FileNotFoundError, NotADirectoryError):
+      return set()
+
+def entry_status(entry) -> str:
+   """Get status emoji for a PDF's log entry (None if not logged)."""
+   if entry and entry.converted:
       return "✓"
-   elif logger.get_entry(pdf_path.stem):
+   elif entry:
       return "↻"
    else:
       return "🗎"
 
+def get_pdf_status(pdf_path: Path, logger: ConversionLogger) -> str:
+   """Get status emoji for a PDF."""
+   return entry_status(logger.get_entry(pdf_path.stem))
+
 # ============================================================================
 # MENU: BROWSE ALL PDFS
 # ============================================================================
@@ -79,10 +106,13 @@ def show_all_pdfs_menu(pdf_dir: Path, converted_dir: Path, logger: ConversionLog
       pause()
       return
 
+   # Snapshot the log once instead of re-checking the log file for every PDF
+   entries = {entry.document_title: entry for entry in logger.list_all()}
+
    # Build options
    pdf_options = []
    for i, pdf_path in enumerate(pdfs, start=1):
-      status = get_pdf_status(pdf_path, logger)
+      status = entry_status(entries.get(pdf_path.stem))
       size_mb = pdf_path.stat().st_size / (1024 * 1024)
       extra = f"[{size_mb:.1f} MB] {status}"
       pdf_options.append(Option(i, pdf_path.stem, extra))
@@ -301,34 +331,39 @@ def execute_qa_extraction(pdf_name: str, entry, logger: ConversionLogger):
    pages_file = output_base / f"{pdf_name}_PageRecords"
    doc_file = output_base / f"{pdf_name}_DocumentRecord"
 
-   # Check if files exist
-   if not pages_file.exists():
+   # Check if files exist (one directory listing instead of a stat per file)
+   names = list_names(output_base)
+   if pages_file.name not in names:
       print(f"✗ Pages file not found: {pages_file}")
       print("Try re-converting the PDF first.")
       pause()
       return
 
-   if not doc_file.exists():
-      print(f"✗ Document file not found: {doc_file}")
-      print("Try re-converting the PDF first.")
-      pause()
-      return
+   # The log records the book_id of the latest conversion; entries logged
+   # before it was tracked fall back to reading the document record
+   book_id = entry.book_id
+   if not book_id:
+      if doc_file.name not in names:
+         print(f"✗ Document file not found: {doc_file}")
+         print("Try re-converting the PDF first.")
+         pause()
+         return
 
-   # Get book_id from document record
-   try:
-      with open(doc_file, 'r', encoding='utf-8') as f:
-         doc_data = json.load(f)
-         book_id = doc_data.get('id')
-         
-      if not book_id:
-         print(f"✗ Could not find book_id in document record")
+      # Get book_id from document record
+      try:
+         with open(doc_file, 'rb') as f:
+            doc_data = orjson.loads(f.read())
+            book_id = doc_data.get('id')
+            
+         if not book_id:
+            print(f"✗ Could not find book_id in document record")
+            pause()
+            return
+            
+      except Exception as e:
+         print(f"✗ Error reading document record: {e}")
          pause()
          return
-         
-   except Exception as e:
-      print(f"✗ Error reading document record: {e}")
-      pause()
-      return
 
    # Run extraction
    try:
@@ -347,8 +382,7 @@ def execute_qa_extraction(pdf_name: str, entry, logger: ConversionLogger):
       try:
          question_count = 0
          if questions_path.exists():
-            with open(questions_path, 'r', encoding='utf-8') as f:
-               question_count = sum(1 for line in f if line.strip())
+            question_count = count_jsonl_records(questions_path)
          
          # Update log
          logger.update_entry(pdf_name, question_count=question_count)
@@ -381,17 +415,18 @@ def show_conversion_details(entry):
       output_base = Path(entry.output_path)
       pages_file = output_base / f"{entry.document_title}_PageRecords"
       doc_file = output_base / f"{entry.document_title}_DocumentRecord"
+      names = list_names(output_base)  # One listing for all four checks
       
       print(f"\nFiles:")
-      print(f"  Pages: {'✓' if pages_file.exists() else '✗'} {pages_file}")
-      print(f"  Document: {'✓' if doc_file.exists() else '✗'} {doc_file}")
+      print(f"  Pages: {'✓' if pages_file.name in names else '✗'} {pages_file}")
+      print(f"  Document: {'✓' if doc_file.name in names else '✗'} {doc_file}")
       
       # Check for Q&A files
       questions_file = output_base / f"{entry.document_title}_Questions.jsonl"
       answers_file = output_base / f"{entry.document_title}_Answers.jsonl"
-      if questions_file.exists():
+      if questions_file.name in names:
          print(f"  Questions: ✓ {questions_file}")
-      if answers_file.exists():
+      if answers_file.name in names:
          print(f"  Answers: ✓ {answers_file}")
 
    pause()
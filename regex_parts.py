@@ -1,5 +1,5 @@
 import re
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
 from qa_schema import Question, Answer, QuestionOption
 
@@ -478,35 +478,49 @@ def find_answers(text: str, questions: List[Question] = None) -> List[Answer]:
 # UTILITY FUNCTIONS
 # ============================================================================
 
+# Compiled once for the has_* checks below. Every question header names exercises, problems
+# or questions and every answer header names solutions or answers, so a substring test on the
+# lowercased text rules out most pages before those regexes run.
+CHAPTER_REGEXES = [re.compile(p, re.IGNORECASE) for p in CHAPTER_PATTERNS]
+SECTION_REGEXES = [re.compile(p, re.IGNORECASE) for p in SECTION_PATTERNS]
+QUESTION_HEADER_REGEXES = [re.compile(p, re.IGNORECASE) for p in QUESTION_HEADER_PATTERNS]
+ANSWER_HEADER_REGEXES = [re.compile(p, re.IGNORECASE) for p in ANSWER_HEADER_PATTERNS]
+QUESTION_HEADER_TRIGGERS = ('exercise', 'problem', 'question')
+ANSWER_HEADER_TRIGGERS = ('solution', 'answer')
+
+def _has_header(text: str, text_lower: str, regexes: List[re.Pattern], triggers: Tuple[str, ...]) -> bool:
+   if not any(t in text_lower for t in triggers):
+      return False
+   return any(r.search(text) for r in regexes)
+
 def has_chapter(text: str) -> bool:
    """Check if text contains an answer/solution section header."""
-   for pattern in CHAPTER_PATTERNS:
-      if re.search(pattern, text, re.IGNORECASE):
-         return True
-   return False
+   return any(r.search(text) for r in CHAPTER_REGEXES)
 
 def has_section(text: str) -> bool:
    """Check if text contains an answer/solution section header."""
-   for pattern in SECTION_PATTERNS:
-      if re.search(pattern, text, re.IGNORECASE):
-         return True
-   return False
+   return any(r.search(text) for r in SECTION_REGEXES)
 
 
 def has_question(text: str) -> bool:
    """Check if text contains a question/exercise section header."""
-   for pattern in QUESTION_HEADER_PATTERNS:
-      if re.search(pattern, text, re.IGNORECASE):
-         return True
-   return False
+   return _has_header(text, text.lower(), QUESTION_HEADER_REGEXES, QUESTION_HEADER_TRIGGERS)
 
 
 def has_answer(text: str) -> bool:
    """Check if text contains an answer/solution section header."""
-   for pattern in ANSWER_HEADER_PATTERNS:
-      if re.search(pattern, text, re.IGNORECASE):
-         return True
-   return False
+   return _has_header(text, text.lower(), ANSWER_HEADER_REGEXES, ANSWER_HEADER_TRIGGERS)
+
+
+def page_flags(text: str) -> Tuple[bool, bool, bool, bool]:
+   """Return (has_chapter, has_section, has_question, has_answer) for a page, lowercasing it once."""
+   text_lower = text.lower()
+   return (
+      has_chapter(text),
+      has_section(text),
+      _has_header(text, text_lower, QUESTION_HEADER_REGEXES, QUESTION_HEADER_TRIGGERS),
+      _has_header(text, text_lower, ANSWER_HEADER_REGEXES, ANSWER_HEADER_TRIGGERS),
+   )
 
 
 # ============================================================================